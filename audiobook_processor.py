@@ -3,10 +3,144 @@ Audiobook processing module - backend logic for splitting audiobooks
 """
 
 import os
+import bisect
+import functools
 import json
 import re
+import shutil
 import subprocess
 import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Source codecs that can be stream-copied into each output format
+COPY_COMPATIBLE_CODECS = {
+    'mp3': ('mp3',),
+    'm4a': ('aac', 'alac'),
+    'm4b': ('aac', 'alac'),
+    'wav': ('pcm_s16le', 'pcm_s24le', 'pcm_s32le', 'pcm_f32le', 'pcm_u8'),
+}
+
+# silencedetect log lines, e.g. "[silencedetect @ 0x...] silence_start: 12.34"
+_SILENCE_RE = re.compile(rb'silence_(start|end): ([\d.]+)')
+
+# Input summary line, e.g. "  Duration: 01:02:03.45, start: 0.000000, bitrate: 64 kb/s"
+_DURATION_RE = re.compile(rb'Duration: (\d+):(\d+):([\d.]+)')
+
+# ffmpeg -progress output; out_time_ms is in microseconds despite its name
+_PROGRESS_RE = re.compile(rb'out_time_ms=(\d+)')
+
+# Spoken chapter announcements, e.g. "Chapter One", "Part 2"
+_CHAPTER_RE = re.compile(
+    r'\b(?:chapter|part|section)\s+(\d+|one|two|three|four|five|[ivxlcdm]+)\b',
+    re.IGNORECASE
+)
+
+# [[HH:]MM:]SS[.fff] timestamps in JSON chapter files
+_TIMESTAMP_RE = re.compile(r'(?:(?:(\d+):)?(\d+):)?(\d+(?:\.\d*)?)$')
+
+# Characters stripped from chapter titles when building file names
+_SAFE_RE = re.compile(r'[^\w\s-]')
+
+# Sample rate used for speech recognition audio
+SPEECH_SAMPLE_RATE = 16000
+
+# Sample rate silence detection runs at
+SILENCE_SAMPLE_RATE = 8000
+
+# Concurrent speech recognition requests
+SPEECH_WORKERS = 16
+
+# Shortest stretch of audio (seconds) worth a separate silencedetect process
+MIN_SILENCE_SHARD = 600
+
+# Environment variable setting ffmpeg threads per chapter when several chapters
+# are encoded at once (unset or 0: split the CPU cores evenly between encoders)
+THREADS_PER_JOB_ENV = 'FFMPEG_THREADS_PER_JOB'
+
+# Bitrate used when chapters have to be encoded and no bitrate was requested
+DEFAULT_BITRATE = '96k'
+
+# Most chapter files one single-pass ffmpeg process writes at once, to stay
+# well under the open file limit (256 by default on macOS)
+MAX_OUTPUTS_PER_PROCESS = 32
+
+# Leading bytes of the input prefetch_file() asks the kernel to read ahead;
+# hinting a whole multi-GB file just gets the early pages evicted again
+PREFETCH_BYTES = 128 * 1024 * 1024
+
+# Seconds a terminated ffmpeg process gets to exit before it is killed
+TERMINATE_TIMEOUT = 1.0
+
+# Max gap/overlap (seconds) between chapters still treated as back-to-back
+CONTIGUOUS_TOLERANCE = 0.5
+
+
+def _subprocess_kwargs():
+    """Keyword arguments for every ffmpeg/ffprobe subprocess
+    
+    stdin is never inherited, and on Windows no console window is opened for
+    the child, which would otherwise flash up once per process in a windowed
+    (GUI or bundled) build.
+    """
+    kwargs = {'stdin': subprocess.DEVNULL}
+    if os.name == 'nt':
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        kwargs['startupinfo'] = startupinfo
+        kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW
+    return kwargs
+
+
+SUBPROCESS_KWARGS = _subprocess_kwargs()
+
+
+@functools.lru_cache(maxsize=None)
+def ffmpeg_has_encoder(ffmpeg_path, encoder):
+    """Check whether an ffmpeg build provides an encoder, running 'ffmpeg -encoders' once per build"""
+    try:
+        result = subprocess.run([ffmpeg_path, '-hide_banner', '-encoders'],
+                                capture_output=True, **SUBPROCESS_KWARGS)
+    except OSError:
+        return False
+    return f' {encoder} '.encode() in result.stdout
+
+
+def prefetch_file(path):
+    """Ask the kernel to start reading the start of a file into the page cache (where supported)"""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, PREFETCH_BYTES, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@dataclass
+class AudioMeta:
+    """Everything split_audiobook needs to know about an input file, from one ffprobe run"""
+    duration: float
+    codec: str = None
+    chapters: list = field(default_factory=list)
 
 
 class AudiobookProcessor:
@@ -15,47 +149,145 @@ class AudiobookProcessor:
         self.ffmpeg_path = ffmpeg_path or 'ffmpeg'
         self.ffprobe_path = ffprobe_path or 'ffprobe'
         
+        # probe() results keyed by (path, mtime, size)
+        self._probe_cache = {}
+        self._probe_lock = threading.Lock()
+        
+        # Running ffmpeg processes, so terminate_all() can stop them
+        self._active_procs = set()
+        self._procs_lock = threading.Lock()
+        self._terminating = False
+        
         # Debug logging
         self.log(f"AudiobookProcessor initialized:")
         self.log(f"  ffmpeg_path: {self.ffmpeg_path}")
         self.log(f"  ffprobe_path: {self.ffprobe_path}")
         
-        import os
-        if os.path.exists(self.ffmpeg_path):
+        if shutil.which(self.ffmpeg_path):
             self.log(f"  ✓ ffmpeg exists at path")
         else:
             self.log(f"  ✗ ffmpeg NOT found at path")
         
-        if os.path.exists(self.ffprobe_path):
+        if shutil.which(self.ffprobe_path):
             self.log(f"  ✓ ffprobe exists at path")
         else:
             self.log(f"  ✗ ffprobe NOT found at path")
     
-    def get_audio_duration(self, input_file):
-        """Get audio duration in seconds"""
+    def _popen(self, cmd, **kwargs):
+        """Start an ffmpeg process that terminate_all() can stop
+        
+        Pass the process to _release() once it has exited.
+        """
+        proc = subprocess.Popen(cmd, **SUBPROCESS_KWARGS, **kwargs)
+        with self._procs_lock:
+            self._active_procs.add(proc)
+            if self._terminating:
+                proc.kill()
+        return proc
+    
+    def _release(self, proc):
+        """Stop tracking a process started with _popen()"""
+        with self._procs_lock:
+            self._active_procs.discard(proc)
+    
+    def terminate_all(self):
+        """Terminate every running ffmpeg process, and kill any this processor starts later
+        
+        Used to stop a job immediately instead of letting the current chapters
+        finish; the interrupted calls raise CalledProcessError. ffmpeg may
+        finish the current output on SIGTERM, so processes still running after
+        TERMINATE_TIMEOUT seconds are killed (from a background thread, so the
+        caller is not blocked).
+        """
+        with self._procs_lock:
+            self._terminating = True
+            procs = [proc for proc in self._active_procs if proc.poll() is None]
+        
+        for proc in procs:
+            proc.terminate()
+        if procs:
+            threading.Thread(target=self._kill_after_timeout, args=(procs,),
+                             daemon=True).start()
+    
+    def _kill_after_timeout(self, procs):
+        """Kill any of procs still running TERMINATE_TIMEOUT seconds from now"""
+        deadline = time.monotonic() + TERMINATE_TIMEOUT
+        for proc in procs:
+            try:
+                proc.wait(max(0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                proc.kill()
+    
+    def _ffmpeg_base(self, loglevel='error'):
+        """Common ffmpeg arguments: never read stdin and keep the log quiet"""
+        return [self.ffmpeg_path, '-nostdin', '-hide_banner', '-loglevel', loglevel]
+    
+    def _file_key(self, input_file):
+        """Cache key that changes whenever the file is modified"""
+        stat = os.stat(input_file)
+        return (input_file, stat.st_mtime, stat.st_size)
+    
+    def probe(self, input_file):
+        """Probe format, first audio stream and chapters in a single ffprobe run
+        
+        The result is cached until the file changes.
+        """
+        key = self._file_key(input_file)
+        with self._probe_lock:
+            if key in self._probe_cache:
+                return self._probe_cache[key]
+        
         cmd = [
             self.ffprobe_path, '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
+            '-show_format', '-show_streams', '-show_chapters',
+            '-select_streams', 'a:0', '-of', 'json',
             input_file
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return float(result.stdout.strip())
+        result = subprocess.run(cmd, capture_output=True, check=True, **SUBPROCESS_KWARGS)
+        data = self._loads(result.stdout)
+        
+        fmt = data.get('format', {})
+        stream = (data.get('streams') or [{}])[0]
+        meta = AudioMeta(
+            duration=float(fmt['duration']),
+            codec=stream.get('codec_name'),
+            chapters=data.get('chapters', [])
+        )
+        
+        with self._probe_lock:
+            self._probe_cache[key] = meta
+        return meta
+    
+    def _cached_duration(self, input_file):
+        """Return the duration of input_file if it has already been probed, else None"""
+        with self._probe_lock:
+            meta = self._probe_cache.get(self._file_key(input_file))
+        return meta.duration if meta else None
+    
+    def get_audio_duration(self, input_file):
+        """Get audio duration in seconds"""
+        return self.probe(input_file).duration
+    
+    def get_audio_codec(self, input_file):
+        """Get the codec name of the first audio stream"""
+        return self.probe(input_file).codec
     
     def detect_chapters_from_metadata(self, input_file):
         """Extract chapters from file metadata"""
         self.log("Checking for embedded chapter metadata...")
         
-        cmd = [self.ffprobe_path, '-v', 'error', '-show_chapters', '-of', 'json', input_file]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        data = json.loads(result.stdout)
+        chapters = self._parse_metadata_chapters(self.probe(input_file).chapters)
         
-        if 'chapters' not in data or not data['chapters']:
+        if not chapters:
             self.log("No embedded chapters found.")
             return None
         
+        self.log(f"Found {len(chapters)} chapters")
+        return chapters
+    
+    def _parse_metadata_chapters(self, chapter_list):
+        """Convert ffprobe chapter entries to (start, end, title) tuples"""
         chapters = []
-        chapter_list = data['chapters']
         
         # Check for opening credits
         skip_first = False
@@ -74,48 +306,145 @@ class AudiobookProcessor:
             title = chapter.get('tags', {}).get('title', f'Chapter {i + 1 - start_index}')
             chapters.append((start, end, title))
         
-        self.log(f"Found {len(chapters)} chapters")
         return chapters
     
-    def detect_chapters_by_silence(self, input_file, threshold=-40, duration=2.0, min_chapter=180):
-        """Detect chapters using silence detection"""
-        self.log(f"Detecting silence (threshold: {threshold}dB, duration: {duration}s)...")
+    def detect_silence_ffmpeg(self, input_file, threshold=-40, duration=2.0, start=0, length=None,
+                              progress_callback=None):
+        """Run ffmpeg silencedetect over input_file
         
-        cmd = [
-            'ffmpeg', '-i', input_file,
+        Returns (silences, media_duration): the (start, end) silences in seconds
+        and the file's duration as reported in ffmpeg's own input summary (None
+        if ffmpeg did not report one), so no separate ffprobe run is needed.
+        
+        With start/length only that part of the file is scanned; the returned
+        times are still relative to the start of the file. progress_callback, if
+        given, is called with the number of seconds scanned so far and the
+        media duration.
+        """
+        cmd = self._ffmpeg_base('info')
+        if start:
+            cmd += ['-ss', str(start)]
+        if length is not None:
+            cmd += ['-t', str(length)]
+        cmd += [
+            '-i', input_file, '-map', '0:a:0', '-vn', '-sn', '-dn',
+            '-ac', '1', '-ar', str(SILENCE_SAMPLE_RATE),
             '-af', f'silencedetect=noise={threshold}dB:d={duration}',
-            '-f', 'null', '-'
+            '-c:a', 'pcm_s16le', '-f', 'null', '-'
         ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, stderr=subprocess.STDOUT)
-        output = result.stdout + result.stderr
+        if progress_callback:
+            cmd[-1:-1] = ['-progress', 'pipe:1', '-nostats']
         
         silence_starts = []
         silence_ends = []
+        media_duration = None
+        
+        # Parse ffmpeg's log as it is written instead of buffering all of it. The
+        # null muxer writes nothing, so stdout and stderr share a single pipe.
+        # Lines are matched as raw bytes, so the log is never decoded.
+        proc = self._popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        try:
+            for line in proc.stdout:
+                if b'[silencedetect' not in line:
+                    if media_duration is None and b'Duration:' in line:
+                        match = _DURATION_RE.search(line)
+                        if match:
+                            hours, minutes, seconds = match.groups()
+                            media_duration = (int(hours) * 3600 + int(minutes) * 60
+                                              + float(seconds))
+                    elif progress_callback:
+                        match = _PROGRESS_RE.match(line)
+                        if match:
+                            progress_callback(int(match.group(1)) / 1000000, media_duration)
+                    continue
+                match = _SILENCE_RE.search(line)
+                if match:
+                    if match.group(1) == b'start':
+                        silence_starts.append(start + float(match.group(2)))
+                    else:
+                        silence_ends.append(start + float(match.group(2)))
+            
+            if proc.wait() != 0:
+                raise subprocess.CalledProcessError(proc.returncode, cmd)
+        finally:
+            proc.stdout.close()
+            self._release(proc)
+        
+        # A silence still running when the scan ends is closed at the chunk
+        # boundary, or at the end of the file when scanning to the end
+        if len(silence_starts) > len(silence_ends):
+            scan_end = start + length if length is not None else media_duration
+            if scan_end is not None:
+                silence_ends.append(scan_end)
+        
+        return list(zip(silence_starts, silence_ends)), media_duration
+    
+    def detect_chapters_by_silence(self, input_file, threshold=-40, duration=2.0, min_chapter=180,
+                                   progress_callback=None):
+        """Detect chapters using silence detection
+        
+        Silence is measured on a mono downmix. Narration is the same in both
+        channels, so the threshold applies to the downmix just as it would to
+        either channel, while the filter only has half the samples to scan.
+        The downmix is also resampled to 8 kHz; boundaries are then accurate to
+        1/8000 s, far finer than the seconds-long silences being looked for.
+        
+        Long files are scanned as several chunks in parallel ffmpeg processes.
+        progress_callback, if given, is called with (seconds scanned, duration).
+        """
+        self.log(f"Detecting silence (threshold: {threshold}dB, duration: {duration}s)...")
+        
+        report = self._progress_logger(progress_callback)
+        prefetch_file(input_file)
+        
+        # Splitting into chunks needs the duration up front. If the file has not
+        # been probed yet, scan it in one pass and take the duration from
+        # ffmpeg's own output rather than spawning ffprobe first.
+        audio_duration = self._cached_duration(input_file)
+        if audio_duration is not None:
+            shards = min((os.cpu_count() or 1) // 2, int(audio_duration // MIN_SILENCE_SHARD))
+        else:
+            shards = 1
+        
+        if shards > 1:
+            chunk = audio_duration / shards
+            self.log(f"  Scanning {shards} chunks in parallel...")
+            # Chunks overlap by the minimum silence length so a silence spanning a
+            # boundary is always reported by at least one chunk
+            with ThreadPoolExecutor(max_workers=shards) as executor:
+                futures = [
+                    executor.submit(self.detect_silence_ffmpeg, input_file, threshold, duration,
+                                    i * chunk, chunk + duration if i < shards - 1 else None,
+                                    functools.partial(report, i))
+                    for i in range(shards)
+                ]
+                silences = self.merge_silences(
+                    [silence for future in futures for silence in future.result()[0]])
+        else:
+            silences, media_duration = self.detect_silence_ffmpeg(
+                input_file, threshold, duration, progress_callback=functools.partial(report, 0))
+            if audio_duration is None:
+                audio_duration = media_duration or self.get_audio_duration(input_file)
         
-        for line in output.split('\n'):
-            if 'silencedetect' in line:
-                if 'silence_start' in line:
-                    match = re.search(r'silence_start: ([\d.]+)', line)
-                    if match:
-                        silence_starts.append(float(match.group(1)))
-                elif 'silence_end' in line:
-                    match = re.search(r'silence_end: ([\d.]+)', line)
-                    if match:
-                        silence_ends.append(float(match.group(1)))
-        
-        silences = list(zip(silence_starts, silence_ends))
         self.log(f"Found {len(silences)} silent segments")
         
-        # Convert to chapters
-        audio_duration = self.get_audio_duration(input_file)
+        # Convert to chapters. Silences are sorted, so instead of testing every
+        # silence, jump straight to the first one at least min_chapter past the
+        # end of the last accepted break.
+        starts = [silence_start for silence_start, _ in silences]
         chapters = []
         last_end = 0
         
-        for silence_start, silence_end in silences:
-            if silence_start - last_end >= min_chapter:
-                chapters.append((last_end, silence_start, f'Chapter {len(chapters) + 1}'))
-                last_end = silence_end
+        i = bisect.bisect_left(starts, min_chapter)
+        while i < len(silences):
+            silence_start, silence_end = silences[i]
+            if silence_start - last_end < min_chapter:
+                # Float rounding at the bisect boundary
+                i += 1
+                continue
+            chapters.append((last_end, silence_start, f'Chapter {len(chapters) + 1}'))
+            last_end = silence_end
+            i = bisect.bisect_left(starts, last_end + min_chapter, i + 1)
         
         if audio_duration - last_end >= min_chapter:
             chapters.append((last_end, audio_duration, f'Chapter {len(chapters) + 1}'))
@@ -127,8 +456,49 @@ class AudiobookProcessor:
         self.log(f"Detected {len(chapters)} chapters")
         return chapters
     
-    def detect_chapters_by_speech(self, input_file, interval=30, window=10):
-        """Detect chapters using speech recognition"""
+    def _progress_logger(self, progress_callback=None):
+        """Return a report(key, seconds, total) function that logs progress in 10% steps
+        
+        Each key (e.g. a parallel chunk) reports how far it has got; the sum
+        over all keys is compared against total, and also passed on to
+        progress_callback(seconds, total) if given.
+        """
+        done = {}
+        lock = threading.Lock()
+        logged = [0]
+        
+        def report(key, seconds, total):
+            if not total:
+                return
+            with lock:
+                done[key] = seconds
+                seconds_done = min(sum(done.values()), total)
+                percent = int(seconds_done / total * 10) * 10
+                if percent > logged[0]:
+                    logged[0] = percent
+                    self.log(f"  Progress: {percent}%")
+                if progress_callback:
+                    progress_callback(seconds_done, total)
+        
+        return report
+    
+    def merge_silences(self, silences):
+        """Sort silences and merge any that overlap or touch"""
+        merged = []
+        for start, end in sorted(silences):
+            if merged and start <= merged[-1][1] + 0.01:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+    
+    def detect_chapters_by_speech(self, input_file, interval=30, window=10, stop_callback=None,
+                                  progress_callback=None):
+        """Detect chapters using speech recognition
+        
+        The file is decoded once to 16 kHz mono PCM through a pipe, and a window
+        of audio is taken from the stream every interval seconds.
+        """
         try:
             import speech_recognition as sr
         except ImportError:
@@ -142,45 +512,53 @@ class AudiobookProcessor:
         recognizer = sr.Recognizer()
         chapter_markers = []
         
-        position = 0
-        while position < duration:
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_path = temp_file.name
-            
-            extract_cmd = [
-                'ffmpeg', '-ss', str(position), '-i', input_file,
-                '-t', str(window), '-ac', '1', '-ar', '16000', '-y', temp_path
-            ]
-            
-            try:
-                subprocess.run(extract_cmd, capture_output=True, check=True)
-                
-                with sr.AudioFile(temp_path) as source:
-                    audio_data = recognizer.record(source)
-                    text = recognizer.recognize_google(audio_data)
-                    
-                    chapter_match = re.search(
-                        r'\b(?:chapter|part|section)\s+(\d+|one|two|three|four|five|[ivxlcdm]+)\b',
-                        text, re.IGNORECASE
-                    )
-                    
-                    if chapter_match:
-                        chapter_name = chapter_match.group(0)
-                        self.log(f"  Found: {chapter_name} at {self.format_timestamp(position)}")
-                        chapter_markers.append((position, chapter_name))
-            
-            except:
-                pass
-            finally:
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
+        prefetch_file(input_file)
+        decode_cmd = self._ffmpeg_base() + [
+            '-i', input_file, '-vn', '-ac', '1',
+            '-ar', str(SPEECH_SAMPLE_RATE), '-f', 's16le', '-'
+        ]
+        proc = self._popen(decode_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        
+        def handle_result(position, future):
+            chapter_name = future.result()
             
-            position += interval
+            if chapter_name:
+                self.log(f"  Found: {chapter_name} at {self.format_timestamp(position)}")
+                chapter_markers.append((position, chapter_name))
             
-            if int(position) % (interval * 5) == 0:
-                progress = (position / duration) * 100
+            next_position = position + interval
+            if progress_callback:
+                progress_callback(min(next_position, duration), duration)
+            if int(next_position) % (interval * 5) == 0:
+                progress = min(next_position / duration, 1.0) * 100
                 self.log(f"  Progress: {progress:.1f}%")
         
+        # Recognition requests are network-bound, so several run at once. Results
+        # are handled in submission order, and only a few windows are kept in
+        # flight so the decoded audio never piles up in memory.
+        pending = deque()
+        try:
+            with ThreadPoolExecutor(max_workers=SPEECH_WORKERS) as executor:
+                for position, pcm in self._iter_pcm_windows(proc.stdout, interval, window):
+                    if stop_callback and stop_callback():
+                        break
+                    
+                    future = executor.submit(self._recognize_window, recognizer, sr, pcm)
+                    pending.append((position, future))
+                    if len(pending) >= SPEECH_WORKERS * 2:
+                        handle_result(*pending.popleft())
+                
+                while pending and not (stop_callback and stop_callback()):
+                    handle_result(*pending.popleft())
+                for _, future in pending:
+                    future.cancel()
+        finally:
+            proc.stdout.close()
+            if proc.poll() is None:
+                proc.terminate()
+            proc.wait()
+            self._release(proc)
+        
         if not chapter_markers:
             self.log("No chapter announcements detected")
             return None
@@ -193,15 +571,83 @@ class AudiobookProcessor:
         self.log(f"Detected {len(chapters)} chapters")
         return chapters
     
+    def _recognize_window(self, recognizer, sr, pcm):
+        """Transcribe one window of 16-bit mono PCM and return the chapter announcement in it
+        
+        Returns None if nothing was understood or no announcement was heard.
+        """
+        try:
+            text = recognizer.recognize_google(sr.AudioData(pcm, SPEECH_SAMPLE_RATE, 2))
+        except Exception:
+            return None
+        
+        chapter_match = _CHAPTER_RE.search(text)
+        return chapter_match.group(0) if chapter_match else None
+    
+    def _iter_pcm_windows(self, stream, interval, window):
+        """Yield (position, pcm) windows of 16-bit mono audio every interval seconds"""
+        interval_bytes = int(interval * SPEECH_SAMPLE_RATE) * 2
+        window_bytes = int(window * SPEECH_SAMPLE_RATE) * 2
+        buffer = bytearray()
+        position = 0
+        
+        while True:
+            while len(buffer) < window_bytes:
+                chunk = stream.read(window_bytes - len(buffer))
+                if not chunk:
+                    break
+                buffer += chunk
+            if not buffer:
+                return
+            
+            yield position, bytes(buffer[:window_bytes])
+            
+            # Drop everything before the next window, reading past any gap
+            if interval_bytes < len(buffer):
+                del buffer[:interval_bytes]
+            else:
+                skip = interval_bytes - len(buffer)
+                buffer.clear()
+                while skip > 0:
+                    chunk = stream.read(min(skip, 1 << 16))
+                    if not chunk:
+                        return
+                    skip -= len(chunk)
+            position += interval
+    
     def load_chapters_from_json(self, json_file, audio_duration):
         """Load chapters from JSON file"""
         self.log(f"Loading chapters from JSON: {json_file}")
         
-        with open(json_file, 'r') as f:
-            data = json.load(f)
+        with open(json_file, 'rb') as f:
+            chapters = self._parse_chapter_items(self._iter_json_items(f), audio_duration)
+        
+        self.log(f"Loaded {len(chapters)} chapters")
+        return chapters
+    
+    def _iter_json_items(self, f):
+        """Iterate over the top-level array of a JSON file
+        
+        Streams with ijson if available; otherwise the file is parsed in one go,
+        with orjson if available. Raises ValueError if the top level is not an
+        array.
+        """
+        if ijson is not None:
+            events = ijson.parse(f, use_float=True)
+            _, event, _ = next(events, (None, None, None))
+            if event != 'start_array':
+                raise ValueError("Invalid JSON format")
+            return ijson.items(events, 'item')
         
+        data = self._loads(f.read())
+        if not isinstance(data, list):
+            raise ValueError("Invalid JSON format")
+        return iter(data)
+    
+    def _parse_chapter_items(self, items, audio_duration):
+        """Convert JSON chapter entries to (start, end, title) tuples"""
         chapters = []
-        for item in data:
+        for item in items:
             if 'start_ms' in item and 'end_ms' in item:
                 start = item['start_ms'] / 1000.0
                 end = item['end_ms'] / 1000.0
@@ -216,7 +662,6 @@ class AudiobookProcessor:
             if 0 <= start < end <= audio_duration:
                 chapters.append((start, end, title))
         
-        self.log(f"Loaded {len(chapters)} chapters")
         return chapters
     
     def parse_timestamp(self, timestamp):
@@ -224,6 +669,11 @@ class AudiobookProcessor:
         if isinstance(timestamp, (int, float)):
             return float(timestamp)
         
+        match = _TIMESTAMP_RE.match(timestamp) if isinstance(timestamp, str) else None
+        if match:
+            hours, minutes, seconds = match.groups()
+            return int(hours or 0) * 3600 + int(minutes or 0) * 60 + float(seconds)
+        
         parts = str(timestamp).split(':')
         if len(parts) == 3:
             h, m, s = map(float, parts)
@@ -240,32 +690,267 @@ class AudiobookProcessor:
         secs = int(seconds % 60)
         return f"{hours:02d}:{minutes:02d}:{secs:02d}"
     
-    def split_audio_segment(self, input_file, start, end, output_file, 
-                           audio_format='mp3', bitrate='128k', mono=False):
-        """Extract audio segment"""
-        duration = end - start
+    def aac_encoder(self):
+        """Prefer the faster Fraunhofer AAC encoder when this ffmpeg build has it"""
+        return 'libfdk_aac' if ffmpeg_has_encoder(self.ffmpeg_path, 'libfdk_aac') else 'aac'
+    
+    def _codec_args(self, audio_format, bitrate, mono, threads, copy, aac_encoder=None):
+        """Output codec arguments for a chapter file
+        
+        aac_encoder, if given, is used for m4a/m4b instead of looking it up.
+        """
+        if copy:
+            return ['-c:a', 'copy', '-avoid_negative_ts', 'make_zero']
         
         if audio_format == 'mp3':
             codec_args = ['-c:a', 'libmp3lame', '-b:a', bitrate]
         elif audio_format in ['m4a', 'm4b']:
-            codec_args = ['-c:a', 'aac', '-b:a', bitrate]
+            codec_args = ['-c:a', aac_encoder or self.aac_encoder(), '-b:a', bitrate]
         else:
-            codec_args = ['-c', 'copy']
+            codec_args = ['-c:a', 'pcm_s16le']
         
-        if mono and audio_format in ['mp3', 'm4a', 'm4b']:
+        if mono:
             codec_args.extend(['-ac', '1'])
+        codec_args.extend(['-threads', str(threads)])
+        return codec_args
+    
+    def build_segment_command(self, input_file, start, end, output_file,
+                              audio_format='mp3', bitrate=DEFAULT_BITRATE, mono=False, threads=0,
+                              copy=False, aac_encoder=None):
+        """Build the ffmpeg command for extracting an audio segment
         
-        cmd = [
-            self.ffmpeg_path, '-ss', str(start), '-i', input_file,
+        With copy=True the source audio is remuxed as-is instead of re-encoded.
+        The seek happens on the input side, so ffmpeg jumps straight to the
+        packet at the start time instead of demuxing everything before it.
+        Re-encoded chapters are still cut at the exact sample; copied ones
+        start on that packet boundary (at most one audio frame early).
+        """
+        duration = end - start
+        codec_args = self._codec_args(audio_format, bitrate, mono, threads, copy, aac_encoder)
+        seek_args = ['-noaccurate_seek'] if copy else []
+        
+        return self._ffmpeg_base() + [
+            *seek_args, '-ss', str(start), '-i', input_file,
             '-t', str(duration), *codec_args, '-vn', '-y', output_file
         ]
+    
+    def build_multi_segment_command(self, input_file, jobs, audio_format='mp3',
+                                    bitrate=DEFAULT_BITRATE, mono=False, threads=0, copy=False,
+                                    aac_encoder=None):
+        """Build one ffmpeg command that writes every (start, end, title, output_file) job
+        
+        The input is seeked to the earliest start and decoded once; each output
+        then selects its own span with output-side -ss/-t.
+        """
+        base = min(start for start, _, _, _ in jobs)
+        codec_args = self._codec_args(audio_format, bitrate, mono, threads, copy, aac_encoder)
+        seek_args = ['-noaccurate_seek'] if copy else []
+        
+        cmd = self._ffmpeg_base() + [*seek_args, '-ss', str(base), '-i', input_file]
+        for start, end, _, output_file in jobs:
+            cmd += [
+                '-map', '0:a:0', '-ss', str(start - base), '-t', str(end - start),
+                *codec_args, '-vn', '-y', output_file
+            ]
+        return cmd
+    
+    def split_audio_segment(self, input_file, start, end, output_file, 
+                           audio_format='mp3', bitrate=DEFAULT_BITRATE, mono=False, threads=0,
+                           copy=False, aac_encoder=None):
+        """Extract audio segment"""
+        cmd = self.build_segment_command(input_file, start, end, output_file,
+                                         audio_format, bitrate, mono, threads, copy,
+                                         aac_encoder)
+        self._run_ffmpeg(cmd, [output_file])
+    
+    def split_audio_segments(self, input_file, jobs, audio_format='mp3', bitrate=DEFAULT_BITRATE,
+                             mono=False, threads=0, copy=False, aac_encoder=None):
+        """Extract several (start, end, title, output_file) jobs with a single ffmpeg process"""
+        if len(jobs) == 1:
+            start, end, _, output_file = jobs[0]
+            self.split_audio_segment(input_file, start, end, output_file, audio_format,
+                                     bitrate, mono, threads, copy, aac_encoder)
+            return
+        cmd = self.build_multi_segment_command(input_file, jobs, audio_format, bitrate,
+                                               mono, threads, copy, aac_encoder)
+        self._run_ffmpeg(cmd, [output_file for _, _, _, output_file in jobs])
+    
+    def _run_ffmpeg(self, cmd, output_files=()):
+        """Run an ffmpeg command, logging its error output if it fails
+        
+        If the command was stopped by terminate_all(), the partial output_files
+        it leaves behind are deleted.
+        """
+        proc = self._popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        try:
+            _, stderr = proc.communicate()
+        finally:
+            self._release(proc)
+        
+        if proc.returncode != 0:
+            if self._terminating:
+                for output_file in output_files:
+                    try:
+                        os.remove(output_file)
+                    except OSError:
+                        pass
+            else:
+                self.log(stderr.decode(errors='replace').strip())
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+    
+    def split_all_segments(self, input_file, chapters_data, output_files):
+        """Stream-copy all chapters in a single ffmpeg pass using the segment muxer
+        
+        Chapters must be contiguous and cover the whole file, since the segment
+        muxer only cuts at the given times.
+        """
+        cmd = self._ffmpeg_base() + ['-i', input_file, '-map', '0:a:0', '-c', 'copy']
+        if len(output_files) == 1:
+            self._run_ffmpeg(cmd + ['-y', output_files[0]], output_files)
+            return
+        
+        ext = os.path.splitext(output_files[0])[1]
+        output_dir = os.path.dirname(output_files[0]) or '.'
+        split_times = ','.join(str(start) for start, _, _ in chapters_data[1:])
+        
+        with tempfile.TemporaryDirectory(dir=output_dir) as temp_dir:
+            # Let the segment muxer number the files, then rename them to chapter names
+            pattern = os.path.join(temp_dir, f"segment_%03d{ext}")
+            cmd += [
+                '-f', 'segment', '-segment_times', split_times,
+                '-reset_timestamps', '1', '-y', pattern
+            ]
+            self._run_ffmpeg(cmd)
+            
+            for i, output_file in enumerate(output_files):
+                os.replace(pattern % i, output_file)
+    
+    def encode_segments(self, input_file, jobs, audio_format='mp3', bitrate=DEFAULT_BITRATE,
+                        mono=False, stop_callback=None, max_workers=None, copy=False,
+                        on_complete=None, single_pass=False):
+        """Extract (start, end, title, output_file) jobs in parallel ffmpeg processes
+        
+        With single_pass=True, consecutive jobs are grouped into one batch per
+        worker (at most MAX_OUTPUTS_PER_PROCESS jobs each, so long books get
+        more batches than workers) and each batch is written by a single
+        ffmpeg process that decodes its stretch of the input once, instead of
+        one process per job.
+        
+        on_complete, if given, is called with the index of each job as it finishes.
+        Returns False if stopped before all jobs finished.
+        """
+        cpu_count = os.cpu_count() or 1
+        workers = max(1, min(max_workers or cpu_count, len(jobs)))
+        # A single encoder picks its own thread count; otherwise split the cores
+        # between the encoders so workers x threads ~= cpu_count, unless
+        # FFMPEG_THREADS_PER_JOB pins it
+        if workers == 1:
+            threads = 0
+        else:
+            threads = self._threads_per_job() or max(1, cpu_count // workers)
         
-        subprocess.run(cmd, capture_output=True, check=True)
+        # Look the AAC encoder up once here rather than in every worker at once
+        aac_encoder = None
+        if audio_format in ['m4a', 'm4b'] and not copy:
+            aac_encoder = self.aac_encoder()
+        
+        if single_pass:
+            batch_size = min(-(-len(jobs) // workers), MAX_OUTPUTS_PER_PROCESS)
+        else:
+            batch_size = 1
+        batches = [range(i, min(i + batch_size, len(jobs)))
+                   for i in range(0, len(jobs), batch_size)]
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for batch in batches:
+                for index in batch:
+                    self.log(f"  Exporting {jobs[index][2]}...")
+                future = executor.submit(self.split_audio_segments, input_file,
+                                         [jobs[index] for index in batch], audio_format,
+                                         bitrate, mono, threads, copy, aac_encoder)
+                futures[future] = batch
+            
+            for future in as_completed(futures):
+                if stop_callback and stop_callback():
+                    self.log("Stopping...")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    return False
+                try:
+                    future.result()
+                except Exception:
+                    # Fail now instead of waiting for the queued chapters
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self.terminate_all()
+                    raise
+                for index in futures[future]:
+                    self.log(f"  ✓ {jobs[index][2]}")
+                    if on_complete:
+                        on_complete(index)
+        
+        return True
+    
+    def _loads(self, data):
+        """Parse a JSON document from bytes, using orjson if available"""
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+    
+    def _threads_per_job(self):
+        """Read FFMPEG_THREADS_PER_JOB from the environment (0 if unset or invalid)"""
+        value = os.environ.get(THREADS_PER_JOB_ENV, '')
+        try:
+            return max(0, int(value or 0))
+        except ValueError:
+            self.log(f"  Ignoring invalid {THREADS_PER_JOB_ENV}={value!r}")
+            return 0
+    
+    def _dumps_line(self, record):
+        """Serialise a record as one JSON Lines entry (bytes), using orjson if available"""
+        if orjson is not None:
+            return orjson.dumps(record) + b'\n'
+        return json.dumps(record).encode() + b'\n'
+    
+    def can_stream_copy(self, input_file, audio_format):
+        """Check whether the source audio can be copied into audio_format as-is"""
+        return self.get_audio_codec(input_file) in COPY_COMPATIBLE_CODECS.get(audio_format, ())
+    
+    def chapters_are_contiguous(self, chapters_data, audio_duration):
+        """Check that chapters run back-to-back from the start to the end of the file"""
+        if not chapters_data:
+            return False
+        if chapters_data[0][0] > CONTIGUOUS_TOLERANCE:
+            return False
+        if abs(chapters_data[-1][1] - audio_duration) > CONTIGUOUS_TOLERANCE:
+            return False
+        return all(abs(nxt[0] - cur[1]) <= CONTIGUOUS_TOLERANCE
+                   for cur, nxt in zip(chapters_data, chapters_data[1:]))
     
     def split_audiobook(self, input_file, output_dir="chapters", method="metadata",
-                       json_file=None, format="mp3", bitrate='128k', mono=False,
-                       stop_callback=None):
-        """Main splitting logic"""
+                       json_file=None, format="mp3", bitrate=None, mono=False,
+                       stop_callback=None, max_workers=None, reencode=False,
+                       single_pass=False, progress_callback=None,
+                       silence_threshold=-40, silence_duration=2.0):
+        """Main splitting logic
+        
+        When no bitrate is given and the source codec already matches the
+        output format, chapters are stream-copied rather than re-encoded, and
+        back-to-back chapters are copied in one ffmpeg pass. Chapters that are
+        encoded without a requested bitrate use DEFAULT_BITRATE. Chapters not
+        copied in one pass are handled concurrently by up to max_workers
+        ffmpeg processes (default: one per CPU core, capped at the number of
+        chapters). Pass reencode=True to always encode (which also gives
+        sample-exact cuts), and single_pass=True to have each ffmpeg process
+        write a batch of consecutive chapters from one read of the input.
+        
+        progress_callback, if given, is called with (seconds done, total
+        seconds) as chapters are detected (silence and speech methods) and
+        again as they are exported.
+        
+        Silence detection (also the fallback for the metadata and speech
+        methods) treats audio below silence_threshold dB for at least
+        silence_duration seconds as a chapter break.
+        """
         
         self.log(f"Loading audiobook: {os.path.basename(input_file)}")
         duration = self.get_audio_duration(input_file)
@@ -282,55 +967,92 @@ class AudiobookProcessor:
                 self.log("Falling back to silence detection...")
                 method = "silence"
         elif method == "speech":
-            chapters_data = self.detect_chapters_by_speech(input_file)
+            chapters_data = self.detect_chapters_by_speech(input_file, stop_callback=stop_callback,
+                                                           progress_callback=progress_callback)
+            if stop_callback and stop_callback():
+                self.log("Stopping...")
+                return None
             if not chapters_data:
                 self.log("Falling back to silence detection...")
                 method = "silence"
         
         if method == "silence":
-            chapters_data = self.detect_chapters_by_silence(input_file)
+            chapters_data = self.detect_chapters_by_silence(input_file, silence_threshold,
+                                                            silence_duration,
+                                                            progress_callback=progress_callback)
         
-        # Display chapters
+        # Build the export jobs and their metadata entries in a single pass
+        base_name = os.path.splitext(os.path.basename(input_file))[0]
+        prefix = os.path.join(output_dir, base_name + '_')
+        ext = '.' + format
+        jobs = []
+        metadata = []
         self.log(f"\nDetected {len(chapters_data)} chapters:")
         for i, (start, end, title) in enumerate(chapters_data, 1):
-            dur = self.format_timestamp(end - start)
-            self.log(f"  {title}: {self.format_timestamp(start)} - {self.format_timestamp(end)} ({dur})")
+            safe_title = _SAFE_RE.sub('', title).strip().replace(' ', '_')
+            output_file = f"{prefix}{i:02d}_{safe_title}{ext}"
+            entry = {
+                "chapter": i,
+                "title": title,
+                "file": output_file,
+                "start": self.format_timestamp(start),
+                "end": self.format_timestamp(end),
+                "duration": self.format_timestamp(end - start)
+            }
+            self.log(f"  {title}: {entry['start']} - {entry['end']} ({entry['duration']})")
+            jobs.append((start, end, title, output_file))
+            metadata.append(entry)
         
         # Create output directory
         os.makedirs(output_dir, exist_ok=True)
         
         # Export chapters
-        base_name = os.path.splitext(os.path.basename(input_file))[0]
         self.log(f"\nExporting chapters to {output_dir}/")
         
-        for i, (start, end, title) in enumerate(chapters_data, 1):
-            if stop_callback and stop_callback():
-                self.log("Stopping...")
-                return None
-            
-            safe_title = re.sub(r'[^\w\s-]', '', title).strip().replace(' ', '_')
-            output_file = os.path.join(output_dir, f"{base_name}_{i:02d}_{safe_title}.{format}")
+        # Stream copy instead of re-encoding when the source already fits the
+        # format and no particular bitrate was asked for (WAV has no bitrate)
+        copy = ((bitrate is None or format == 'wav') and not reencode and not mono
+                and self.can_stream_copy(input_file, format))
+        bitrate = bitrate or DEFAULT_BITRATE
+        if copy:
+            self.log("  Copied chapters are cut at the nearest audio frame (a few ms); "
+                     "re-encode for sample-exact cuts")
+        
+        # Record each chapter as soon as its file is written, so an interrupted
+        # run still leaves a list of the chapters that were completed
+        metadata_file = f"{prefix}chapters.json"
+        progress_file = f"{prefix}chapters.jsonl"
+        total_seconds = sum(end - start for start, end, _, _ in jobs)
+        exported = [0]
+        with open(progress_file, 'wb') as progress:
+            def record(index):
+                progress.write(self._dumps_line(metadata[index]))
+                progress.flush()
+                if progress_callback:
+                    start, end, _, _ = jobs[index]
+                    exported[0] += end - start
+                    progress_callback(exported[0], total_seconds)
             
-            self.log(f"  Exporting {title}...")
-            self.split_audio_segment(input_file, start, end, output_file, format, bitrate, mono)
+            if copy and self.chapters_are_contiguous(chapters_data, duration):
+                if stop_callback and stop_callback():
+                    self.log("Stopping...")
+                    return None
+                self.log("  Source already matches output format - copying all chapters in one pass")
+                self.split_all_segments(input_file, chapters_data, [job[3] for job in jobs])
+                for index in range(len(jobs)):
+                    record(index)
+            else:
+                if copy:
+                    self.log("  Source already matches output format - copying without re-encoding")
+                if not self.encode_segments(input_file, jobs, format, bitrate, mono,
+                                            stop_callback, max_workers, copy, on_complete=record,
+                                            single_pass=single_pass):
+                    return None
         
         # Save metadata
-        metadata = []
-        for i, (start, end, title) in enumerate(chapters_data, 1):
-            safe_title = re.sub(r'[^\w\s-]', '', title).strip().replace(' ', '_')
-            output_file = os.path.join(output_dir, f"{base_name}_{i:02d}_{safe_title}.{format}")
-            metadata.append({
-                "chapter": i,
-                "title": title,
-                "file": output_file,
-                "start": self.format_timestamp(start),
-                "end": self.format_timestamp(end),
-                "duration": self.format_timestamp(end - start)
-            })
-        
-        metadata_file = os.path.join(output_dir, f"{base_name}_chapters.json")
         with open(metadata_file, 'w') as f:
             json.dump(metadata, f, indent=2)
+        os.remove(progress_file)
         
         self.log(f"\nMetadata saved to: {metadata_file}")
         return len(chapters_data)
\ No newline at end of file
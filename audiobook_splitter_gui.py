@@ -10,9 +10,20 @@ import threading
 import os
 import json
 import re
+import shutil
 import subprocess
 import tempfile
-import queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from audiobook_processor import AudiobookProcessor, SUBPROCESS_KWARGS
+
+# Oldest log lines are dropped beyond this, so long runs keep the Text widget small
+MAX_LOG_LINES = 5000
+
+# Log messages waiting to be shown; if the GUI falls this far behind, the oldest are dropped
+LOG_QUEUE_SIZE = 1024
 
 
 class AudiobookSplitterGUI:
@@ -21,21 +32,45 @@ class AudiobookSplitterGUI:
         self.root.title("Audiobook Chapter Splitter")
         self.root.geometry("800x700")
         
-        # Queue for thread-safe logging
-        self.log_queue = queue.Queue()
+        # Bounded queue for thread-safe logging (deque appends/pops are atomic)
+        self.log_queue = deque(maxlen=LOG_QUEUE_SIZE)
         
         # Variables
         self.input_file = tk.StringVar()
+        # Parsed form of input_file, kept in step whether it is browsed or typed
+        self._input_path = None
+        self.input_file.trace_add('write', self._on_input_change)
         self.output_dir = tk.StringVar(value="chapters")
         self.method = tk.StringVar(value="metadata")
         self.format_var = tk.StringVar(value="mp3")
-        self.bitrate = tk.StringVar(value="96k")
+        self.bitrate = tk.StringVar(value="auto")
         self.mono = tk.BooleanVar(value=False)
+        self.stream_copy = tk.BooleanVar(value=True)
+        self.silence_threshold = tk.DoubleVar(value=-40)
+        self.silence_duration = tk.DoubleVar(value=2.0)
+        # Parallel ffmpeg processes, leaving one core free for the UI
+        self.cpu_count = os.cpu_count() or 1
+        self.jobs = tk.IntVar(value=max(1, self.cpu_count - 1))
         self.json_file = tk.StringVar()
-        self.processing = False
+        
+        # Jobs run one at a time on a single reused worker thread; setting
+        # _stop asks the running job to stop at its next check
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._stop = threading.Event()
+        # Processor of the running job, so Stop can terminate its ffmpeg processes
+        self._processor = None
+        # Set when the window is closing; the worker then makes no more Tk calls
+        self._closing = False
+        
+        # Set once ffmpeg has been found
+        self._ffmpeg_ok = False
+        
+        # Last percentage shown on the progress bar
+        self._progress_percent = 0
         
         self.create_widgets()
-        self.check_log_queue()
+        self.root.bind('<<LogMsg>>', lambda event: self._drain_log_queue())
+        self.root.protocol('WM_DELETE_WINDOW', self.on_close)
         
     def create_widgets(self):
         # Main container with padding
@@ -124,11 +159,11 @@ class AudiobookSplitterGUI:
         bitrate_frame.grid(row=row, column=1, columnspan=2, sticky=tk.W, pady=5)
         
         bitrate_combo = ttk.Combobox(bitrate_frame, textvariable=self.bitrate,
-                                    values=["32k", "48k", "64k", "96k", "128k", "192k"],
+                                    values=["auto", "32k", "48k", "64k", "96k", "128k", "192k"],
                                     state="readonly", width=10)
         bitrate_combo.grid(row=0, column=0)
         
-        ttk.Label(bitrate_frame, text="  (Lower = smaller files)", 
+        ttk.Label(bitrate_frame, text="  (Lower = smaller files; auto keeps the source quality)", 
                  foreground="gray").grid(row=0, column=1, sticky=tk.W)
         row += 1
         
@@ -138,6 +173,43 @@ class AudiobookSplitterGUI:
                                                sticky=tk.W, pady=5)
         row += 1
         
+        # Stream copy checkbox, only meaningful with the "auto" bitrate
+        self.stream_copy_check = ttk.Checkbutton(
+            main_frame, text="Stream copy when possible (much faster, no quality loss)", 
+            variable=self.stream_copy)
+        self.stream_copy_check.grid(row=row, column=0, columnspan=2, sticky=tk.W, pady=5)
+        self.bitrate.trace_add('write', self.on_bitrate_change)
+        row += 1
+        
+        # Silence detection settings
+        ttk.Label(main_frame, text="Silence Detection:").grid(
+            row=row, column=0, sticky=tk.W, pady=5)
+        silence_frame = ttk.Frame(main_frame)
+        silence_frame.grid(row=row, column=1, columnspan=2, sticky=tk.W, pady=5)
+        
+        ttk.Spinbox(silence_frame, from_=-80, to=-10, increment=5,
+                    textvariable=self.silence_threshold, state="readonly",
+                    width=5).grid(row=0, column=0)
+        ttk.Label(silence_frame, text=" dB for at least ").grid(row=0, column=1)
+        ttk.Spinbox(silence_frame, from_=0.5, to=10, increment=0.5,
+                    textvariable=self.silence_duration, state="readonly",
+                    width=5).grid(row=0, column=2)
+        ttk.Label(silence_frame, text=" s").grid(row=0, column=3)
+        row += 1
+        
+        # Parallel jobs
+        ttk.Label(main_frame, text="Parallel Jobs:").grid(
+            row=row, column=0, sticky=tk.W, pady=5)
+        jobs_frame = ttk.Frame(main_frame)
+        jobs_frame.grid(row=row, column=1, columnspan=2, sticky=tk.W, pady=5)
+        
+        ttk.Spinbox(jobs_frame, from_=1, to=self.cpu_count, textvariable=self.jobs,
+                    state="readonly", width=5).grid(row=0, column=0)
+        
+        ttk.Label(jobs_frame, text="  (Chapters encoded at once)", 
+                 foreground="gray").grid(row=0, column=1, sticky=tk.W)
+        row += 1
+        
         # Output directory
         ttk.Label(main_frame, text="Output Directory:").grid(
             row=row, column=0, sticky=tk.W, pady=5)
@@ -161,8 +233,8 @@ class AudiobookSplitterGUI:
             row=row, column=0, sticky=tk.W, pady=(0, 5))
         row += 1
         
-        # Progress bar
-        self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
+        # Progress bar, in percent of the current stage (detection, then export)
+        self.progress = ttk.Progressbar(main_frame, mode='determinate', maximum=100)
         self.progress.grid(row=row, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
         row += 1
         
@@ -200,6 +272,11 @@ class AudiobookSplitterGUI:
         else:
             self.json_frame.grid_forget()
     
+    def on_bitrate_change(self, *args):
+        """Stream copy keeps the source bitrate, so it is only offered with the auto bitrate"""
+        state = 'normal' if self.bitrate.get() == "auto" else 'disabled'
+        self.stream_copy_check.config(state=state)
+    
     def browse_input(self):
         filename = filedialog.askopenfilename(
             title="Select Audiobook File",
@@ -210,7 +287,12 @@ class AudiobookSplitterGUI:
         )
         if filename:
             self.input_file.set(filename)
-            self.log(f"File selected: {os.path.basename(filename)}")
+            self.log(f"File selected: {self._input_path.name}")
+    
+    def _on_input_change(self, *args):
+        """Re-parse the input path whenever the field changes"""
+        value = self.input_file.get()
+        self._input_path = Path(value) if value else None
     
     def browse_json(self):
         filename = filedialog.askopenfilename(
@@ -226,22 +308,35 @@ class AudiobookSplitterGUI:
             self.output_dir.set(directory)
     
     def log(self, message):
-        """Thread-safe logging"""
-        self.log_queue.put(message)
+        """Thread-safe logging
+        
+        The message is queued and a virtual event wakes the Tk event loop to
+        show it, so nothing polls the queue while the window is idle.
+        """
+        if self._closing:
+            return
+        self.log_queue.append(message)
+        try:
+            self.root.event_generate('<<LogMsg>>', when='tail')
+        except (tk.TclError, RuntimeError):
+            # Window closed between the check and the call
+            pass
     
-    def check_log_queue(self):
-        """Check for log messages and update GUI"""
+    def _drain_log_queue(self):
+        """Show all queued log messages with a single Text insert"""
+        messages = []
         try:
             while True:
-                message = self.log_queue.get_nowait()
-                self.log_text.config(state='normal')
-                self.log_text.insert(tk.END, message + "\n")
-                self.log_text.see(tk.END)
-                self.log_text.config(state='disabled')
-        except queue.Empty:
+                messages.append(self.log_queue.popleft())
+        except IndexError:
             pass
-        finally:
-            self.root.after(100, self.check_log_queue)
+        
+        if messages:
+            self.log_text.config(state='normal')
+            self.log_text.insert(tk.END, '\n'.join(messages) + '\n')
+            self.log_text.delete('1.0', f'end-{MAX_LOG_LINES}l')
+            self.log_text.see(tk.END)
+            self.log_text.config(state='disabled')
     
     def clear_log(self):
         self.log_text.config(state='normal')
@@ -249,30 +344,91 @@ class AudiobookSplitterGUI:
         self.log_text.config(state='disabled')
     
     def validate_inputs(self):
-        """Validate user inputs before processing"""
-        if not self.input_file.get():
-            messagebox.showerror("Error", "Please select an input audiobook file.")
-            return False
+        """Validate user inputs before processing
         
-        if not os.path.exists(self.input_file.get()):
-            messagebox.showerror("Error", "Input file does not exist.")
-            return False
+        Problems with the form and ffmpeg are reported together in one dialog.
+        The output directory is only created once those checks have passed.
+        """
+        errors = []
+        
+        if self._input_path is None:
+            errors.append("Please select an input audiobook file.")
+        elif not self._input_path.exists():
+            errors.append("Input file does not exist.")
         
         if self.method.get() == "json" and not self.json_file.get():
-            messagebox.showerror("Error", "Please select a JSON file for the JSON method.")
-            return False
+            errors.append("Please select a JSON file for the JSON method.")
         
         # Check if ffmpeg is available
-        try:
-            subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            messagebox.showerror("Error", 
-                "ffmpeg not found. Please install ffmpeg:\n\n"
+        if not self.check_ffmpeg():
+            errors.append(
+                "ffmpeg/ffprobe not found. Please install ffmpeg:\n\n"
                 "Mac: brew install ffmpeg\n"
                 "Ubuntu: sudo apt-get install ffmpeg\n"
                 "Windows: download from ffmpeg.org")
+        
+        if errors:
+            messagebox.showerror("Error", "\n\n".join(errors))
+            return False
+        
+        # Create the output directory now, so a bad path fails before any work
+        output_dir = self.output_dir.get()
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+        except OSError as e:
+            messagebox.showerror("Error", f"Cannot create output directory:\n\n{e}")
             return False
         
+        # Compressed chapters take at most about as much space as the input (WAV
+        # output can be far larger and is not estimated)
+        needed = self._input_path.stat().st_size * 1.1
+        free = shutil.disk_usage(output_dir).free
+        if self.format_var.get() != "wav" and free < needed:
+            if not messagebox.askyesno("Low Disk Space",
+                    f"The output directory has {free / 1e9:.1f} GB free, but the chapters "
+                    f"may need up to {needed / 1e9:.1f} GB.\n\nContinue anyway?"):
+                return False
+        
+        return True
+    
+    def tool_paths(self):
+        """Return the (ffmpeg, ffprobe) paths to use; None means look the tool up on PATH
+        
+        FFMPEG_PATH and FFPROBE_PATH select custom binaries. Without
+        FFPROBE_PATH, an ffprobe next to a custom ffmpeg is used if present.
+        """
+        ffmpeg_path = os.environ.get('FFMPEG_PATH') or None
+        ffprobe_path = os.environ.get('FFPROBE_PATH') or None
+        if ffmpeg_path and not ffprobe_path:
+            directory, name = os.path.split(ffmpeg_path)
+            sibling = os.path.join(directory, name.replace('ffmpeg', 'ffprobe'))
+            if sibling != ffmpeg_path and os.path.exists(sibling):
+                ffprobe_path = sibling
+        return ffmpeg_path, ffprobe_path
+    
+    def check_ffmpeg(self):
+        """Check that ffmpeg and ffprobe are installed
+        
+        Normally a PATH lookup, without starting a process. Custom binaries
+        (see tool_paths) are run once with -version instead. A success is
+        remembered; failures are not cached, so installing ffmpeg while the
+        window is open is picked up on the next attempt.
+        """
+        if self._ffmpeg_ok:
+            return True
+        
+        for name, path in zip(('ffmpeg', 'ffprobe'), self.tool_paths()):
+            if not path:
+                if shutil.which(name) is None:
+                    return False
+                continue
+            try:
+                subprocess.run([path, '-version'], capture_output=True, check=True,
+                               **SUBPROCESS_KWARGS)
+            except (subprocess.CalledProcessError, OSError):
+                return False
+        
+        self._ffmpeg_ok = True
         return True
     
     def start_processing(self):
@@ -280,58 +436,101 @@ class AudiobookSplitterGUI:
         if not self.validate_inputs():
             return
         
-        self.processing = True
+        self._stop.clear()
         self.start_button.config(state='disabled')
         self.stop_button.config(state='normal')
-        self.progress.start()
-        
-        # Run processing in separate thread
-        thread = threading.Thread(target=self.process_audiobook, daemon=True)
-        thread.start()
+        self.progress['value'] = 0
+        self._progress_percent = 0
+        
+        # Read the form once on the GUI thread; edits made while the job runs
+        # do not affect it
+        params = {
+            'input_file': self.input_file.get(),
+            'output_dir': self.output_dir.get(),
+            'method': self.method.get(),
+            'json_file': self.json_file.get() or None,
+            'format': self.format_var.get(),
+            'bitrate': None if self.bitrate.get() == "auto" else self.bitrate.get(),
+            'mono': self.mono.get(),
+            'max_workers': self.jobs.get(),
+            'reencode': not self.stream_copy.get(),
+            'silence_threshold': self.silence_threshold.get(),
+            'silence_duration': self.silence_duration.get(),
+        }
+        
+        # Run processing on the worker thread
+        self._executor.submit(self.process_audiobook, params)
     
     def stop_processing(self):
-        """Stop the processing"""
-        self.processing = False
-        self.log("Stopping... (current chapter will complete)")
+        """Stop the processing, terminating any running ffmpeg processes"""
+        self._stop.set()
+        processor = self._processor
+        if processor:
+            processor.terminate_all()
+        self.log("Stopping...")
     
-    def process_audiobook(self):
-        """Main processing logic (runs in separate thread)"""
+    def process_audiobook(self, params):
+        """Main processing logic (runs in separate thread)
+        
+        params holds the split_audiobook arguments read from the form.
+        """
         try:
-            from audiobook_processor import AudiobookProcessor
-            
-            processor = AudiobookProcessor(self.log)
+            processor = AudiobookProcessor(self.log, *self.tool_paths())
+            self._processor = processor
+            # Stop may have been pressed before the processor existed
+            if self._stop.is_set():
+                processor.terminate_all()
             
             result = processor.split_audiobook(
-                input_file=self.input_file.get(),
-                output_dir=self.output_dir.get(),
-                method=self.method.get(),
-                json_file=self.json_file.get() if self.json_file.get() else None,
-                format=self.format_var.get(),
-                bitrate=self.bitrate.get(),
-                mono=self.mono.get(),
-                stop_callback=lambda: not self.processing
+                stop_callback=self._stop.is_set,
+                progress_callback=self.report_progress,
+                **params
             )
             
-            if result and self.processing:
+            if result and not self._stop.is_set():
                 self.log("\n✓ Processing complete!")
                 messagebox.showinfo("Success", 
                     f"Successfully split audiobook into {result} chapters!")
-            elif not self.processing:
+            elif self._stop.is_set():
                 self.log("\n✗ Processing stopped by user")
         
         except Exception as e:
-            self.log(f"\n✗ Error: {str(e)}")
-            messagebox.showerror("Error", f"An error occurred:\n\n{str(e)}")
+            if self._stop.is_set():
+                # Terminated ffmpeg processes surface as errors
+                self.log("\n✗ Processing stopped by user")
+            else:
+                self.log(f"\n✗ Error: {str(e)}")
+                messagebox.showerror("Error", f"An error occurred:\n\n{str(e)}")
         
         finally:
-            self.root.after(0, self.processing_complete)
+            self._processor = None
+            if not self._closing:
+                self.root.after(0, self.processing_complete)
+    
+    def report_progress(self, done, total):
+        """Thread-safe progress update; redraws only when the whole percentage changes"""
+        percent = int(done / total * 100) if total else 0
+        if percent != self._progress_percent and not self._closing:
+            self._progress_percent = percent
+            self.root.after(0, self.progress.configure, {'value': percent})
     
     def processing_complete(self):
         """Clean up after processing"""
-        self.progress.stop()
         self.start_button.config(state='normal')
         self.stop_button.config(state='disabled')
-        self.processing = False
+    
+    def on_close(self):
+        """Stop any running job and close the window
+        
+        Running ffmpeg processes are terminated. The worker thread is not a
+        daemon, so the interpreter still waits for the job to unwind instead
+        of killing the thread midway; once _closing is set it no longer
+        touches Tk, which would block and fail without a main loop.
+        """
+        self._closing = True
+        self.stop_processing()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
 
 
 def main():
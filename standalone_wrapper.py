@@ -21,8 +21,19 @@ def main():
                        help="Detection method")
     parser.add_argument("--json", help="JSON file with chapters")
     parser.add_argument("--format", default="mp3", help="Output format")
-    parser.add_argument("--bitrate", default="96k", help="Audio bitrate")
+    parser.add_argument("--bitrate", default="auto",
+                       help="Audio bitrate (auto: copy the source audio when possible, else 96k)")
     parser.add_argument("--mono", action="store_true", help="Convert to mono")
+    parser.add_argument("--silence-threshold", type=float, default=-40,
+                       help="Silence detection noise threshold in dB")
+    parser.add_argument("--silence-duration", type=float, default=2.0,
+                       help="Minimum silence length in seconds for a chapter break")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(),
+                       help="Number of chapters to encode in parallel")
+    parser.add_argument("--reencode", action="store_true",
+                       help="Always re-encode, even when the source can be copied")
+    parser.add_argument("--single-pass", action="store_true",
+                       help="Write batches of consecutive chapters from one ffmpeg process each")
     parser.add_argument("--ffmpeg-path", default="ffmpeg", help="Path to ffmpeg executable")
     parser.add_argument("--ffprobe-path", default="ffprobe", help="Path to ffprobe executable")
     
@@ -31,22 +42,6 @@ def main():
     def log(message):
         print(message, flush=True)
     
-    # Debug logging
-    log(f"Received ffmpeg path: {args.ffmpeg_path}")
-    log(f"Received ffprobe path: {args.ffprobe_path}")
-    
-    # Check if they exist
-    import os
-    if os.path.exists(args.ffmpeg_path):
-        log(f"✓ ffmpeg found at: {args.ffmpeg_path}")
-    else:
-        log(f"✗ ffmpeg NOT found at: {args.ffmpeg_path}")
-    
-    if os.path.exists(args.ffprobe_path):
-        log(f"✓ ffprobe found at: {args.ffprobe_path}")
-    else:
-        log(f"✗ ffprobe NOT found at: {args.ffprobe_path}")
-    
     try:
         processor = AudiobookProcessor(log, args.ffmpeg_path, args.ffprobe_path)
         
@@ -56,8 +51,13 @@ def main():
             method=args.method,
             json_file=args.json,
             format=args.format,
-            bitrate=args.bitrate,
-            mono=args.mono
+            bitrate=None if args.bitrate == "auto" else args.bitrate,
+            mono=args.mono,
+            max_workers=args.jobs,
+            reencode=args.reencode,
+            single_pass=args.single_pass,
+            silence_threshold=args.silence_threshold,
+            silence_duration=args.silence_duration
         )
         
         # Output chapter count for Swift to parse